@@ -2,21 +2,40 @@
 
 This module defines the core data structures used throughout the property management system.
 Each class represents a key entity in the property management domain and is implemented
-as a dataclass with JSON serialization support.
+as a msgspec Struct with JSON serialization support.
 """
 
-from typing import Dict, List, Optional
-from dataclasses import dataclass, field
-from dataclasses_json import dataclass_json
+from typing import Any, Dict, List, Optional
+import msgspec
+from msgspec import field
 import uuid
 
 def generate_id() -> str:
     """Generate a unique ID string for model instances."""
     return str(uuid.uuid4())
 
-@dataclass_json
-@dataclass
-class Address:
+class Model(msgspec.Struct):
+    """Base class for all data models providing JSON serialization."""
+    
+    def to_json(self) -> str:
+        """Serialize the model to a JSON string."""
+        return msgspec.json.encode(self).decode()
+    
+    @classmethod
+    def from_json(cls, data: str):
+        """Deserialize a model from a JSON string."""
+        return msgspec.json.decode(data, type=cls)
+    
+    def to_dict(self) -> Dict[str, Any]:
+        """Convert the model to a dictionary of builtin types."""
+        return msgspec.to_builtins(self)
+    
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]):
+        """Create a model from a dictionary, validating field types."""
+        return msgspec.convert(data, type=cls)
+
+class Address(Model):
     """Physical address with street, city, state, and zip code.
     
     Represents a complete physical location including street address, city, state, and postal code.
@@ -27,9 +46,7 @@ class Address:
     state: Optional[str] = None   # State/province (2-letter code for US)
     zip: Optional[str] = None     # Postal/ZIP code
 
-@dataclass_json
-@dataclass
-class ContactInfo:
+class ContactInfo(Model):
     """Contact information including email, phone, and address.
     
     Stores all contact details for an entity, tenant, or other party.
@@ -40,9 +57,7 @@ class ContactInfo:
     addressId: Optional[str] = None  # Reference to the address ID
     address: Optional[Address] = None  # Optional mailing/physical address
 
-@dataclass_json
-@dataclass
-class Lease:
+class Lease(Model):
     """Lease agreement details including dates, amounts, and relationships.
     
     Represents a rental agreement between a tenant and property owner for a specific unit.
@@ -57,9 +72,7 @@ class Lease:
     securityDeposit: Optional[float] = None  # Security deposit amount
     dueDate: Optional[str] = None  # Day of month rent is due (1-31) or text description
 
-@dataclass_json
-@dataclass
-class Tenant:
+class Tenant(Model):
     """Tenant information including personal details and lease.
     
     Represents a person renting a unit with their contact information and lease details.
@@ -72,9 +85,7 @@ class Tenant:
     leaseId: Optional[str] = None  # Reference to the lease ID
     lease: Optional[Lease] = None  # Current lease agreement
 
-@dataclass_json
-@dataclass
-class Unit:
+class Unit(Model):
     """Property unit information including current tenant and documentation.
     
     Represents an individual unit within a property that can be rented.
@@ -85,9 +96,7 @@ class Unit:
     currentTenantId: Optional[str] = None  # Reference to the current tenant ID
     currentTenant: Optional[Tenant] = None  # Current tenant, if unit is occupied
 
-@dataclass_json
-@dataclass
-class Entity:
+class Entity(Model):
     """Legal entity (person or organization) with contact and tax information.
     
     Represents an owner (individual or business) of one or more properties.
@@ -99,9 +108,7 @@ class Entity:
     contactInfo: Optional[ContactInfo] = None  # Contact information for the entity
     taxId: Optional[str] = None  # EIN or SSN - Tax ID (SSN for individuals, EIN for businesses)
 
-@dataclass_json
-@dataclass
-class Property:
+class Property(Model):
     """Property information including location, ownership, and units.
     
     Represents a real estate property with its address, owner, and associated units.
@@ -11,7 +11,13 @@ This script:
 
 import os
 import base64
+import hashlib
+import html
+import logging
 import re
+import shutil
+import threading
+from concurrent.futures import ThreadPoolExecutor
 import datetime
 from google.auth.transport.requests import Request
 from google.oauth2.credentials import Credentials
@@ -19,11 +25,32 @@ from google_auth_oauthlib.flow import InstalledAppFlow
 from googleapiclient.discovery import build
 import html2text
 
+# selectolax is optional; it strips HTML much faster than html2text
+try:
+    from selectolax.lexbor import LexborHTMLParser
+    SELECTOLAX_AVAILABLE = True
+except ImportError:
+    SELECTOLAX_AVAILABLE = False
+
+# pybase64 is optional; it uses SIMD kernels and is much faster than stdlib base64
+try:
+    import pybase64
+    b64decode = pybase64.urlsafe_b64decode
+except ImportError:
+    b64decode = base64.urlsafe_b64decode
+
 # Use absolute import path when running as a script
 import sys
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 from src.property_processor import PropertyProcessor, process_property_document
 
+# Configure logging
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+if not SELECTOLAX_AVAILABLE:
+    logger.warning("selectolax.lexbor is unavailable; HTML bodies are stripped with the slower regex fallback")
+
 # Get the directory where this script is located
 SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
 
@@ -34,18 +61,54 @@ SCOPES = ['https://www.googleapis.com/auth/gmail.readonly']
 CREDENTIALS_PATH = os.path.join(SCRIPT_DIR, 'GmailCredentials', 'credentials.json')
 TOKEN_PATH = os.path.join(SCRIPT_DIR, 'GmailCredentials', 'token.json')
 
+# Maximum number of requests the Gmail API allows in a single batch
+BATCH_LIMIT = 100
+
+# html2text converter for each thread, created on first use by get_html2text
+_H2T = threading.local()
+
+# Matches the charset parameter of a Content-Type header
+CHARSET_PATTERN = re.compile(r'charset="?([\w.:-]+)"?', re.IGNORECASE)
+
+# Patterns for the regex HTML stripper used when selectolax is not installed
+HTML_SKIP_PATTERN = re.compile(r'<(script|style|head)\b.*?</\1\s*>|<!--.*?-->', re.IGNORECASE | re.DOTALL)
+HTML_BREAK_PATTERN = re.compile(r'<(?:br|/p|/div|/li|/tr|/h[1-6])\b[^>]*>', re.IGNORECASE)
+HTML_TAG_PATTERN = re.compile(r'<[^>]+>')
+BLANK_LINES_PATTERN = re.compile(r'\n\s*\n+')
+
+# Characters that are not allowed in file and directory names
+INVALID_FILENAME_PATTERN = re.compile(r'[\\/*?:"<>|]')
+
+# Size of each base64 slice decoded when saving attachments (must be a multiple of 4)
+DECODE_CHUNK_SIZE = 4 * 65536
+
+# Buffer size used when writing decoded attachments, to issue fewer write syscalls
+WRITE_BUFFER_SIZE = 1 << 20
+
+# Number of attachments converted to text concurrently (each conversion waits on GPT)
+EXTRACTION_WORKERS = 4
+
+# Gmail API service, created on first use by get_gmail_service
+_gmail_service = None
+
 # Base directory for email-specific folders
 EMAILS_BASE_DIR = os.path.join(SCRIPT_DIR, 'Emails')
 
+# Content-addressed store of decoded attachments shared by all emails
+ATTACHMENT_CACHE_DIR = os.path.join(EMAILS_BASE_DIR, '.attachment_cache')
+
+# Maximum total size of the attachment cache; least recently used entries are evicted beyond it
+ATTACHMENT_CACHE_MAX_BYTES = 1 << 30
+
 def sanitize_filename(text):
     """Convert text to a valid filename by removing invalid characters"""
     # Replace invalid filename characters with underscores
-    return re.sub(r'[\\/*?:"<>|]', "_", text)
+    return INVALID_FILENAME_PATTERN.sub("_", text)
 
 def create_email_directory(sender, subject, date_time):
     """Create a directory for this specific email based on metadata"""
     # Sanitize sender and subject for use in directory name
-    safe_sender = sanitize_filename(sender.split('<')[0].strip())[:30]  # Limit length
+    safe_sender = sanitize_filename(sender.partition('<')[0].strip())[:30]  # Limit length
     safe_subject = sanitize_filename(subject)[:50]  # Limit length
     
     # Format date_time for directory name
@@ -58,13 +121,16 @@ def create_email_directory(sender, subject, date_time):
     full_path = os.path.join(EMAILS_BASE_DIR, dir_name)
     
     # Create directory if it doesn't exist
-    if not os.path.exists(full_path):
-        os.makedirs(full_path)
+    os.makedirs(full_path, exist_ok=True)
     
     return full_path
 
 def get_gmail_service():
-    """Authenticate and get Gmail API service"""
+    """Authenticate and get Gmail API service, reusing it across calls"""
+    global _gmail_service
+    if _gmail_service is not None:
+        return _gmail_service
+    
     creds = None
     if os.path.exists(TOKEN_PATH):
         creds = Credentials.from_authorized_user_file(TOKEN_PATH, SCOPES)
@@ -76,49 +142,219 @@ def get_gmail_service():
             creds = flow.run_local_server(port=0)
         with open(TOKEN_PATH, 'w') as token:
             token.write(creds.to_json())
-    return build('gmail', 'v1', credentials=creds)
+    # Use the discovery document bundled with the client library, skipping the probe
+    # for a discovery cache that would never be consulted for it
+    _gmail_service = build('gmail', 'v1', credentials=creds,
+                           static_discovery=True, cache_discovery=False)
+    return _gmail_service
 
 def save_attachment(part_data, filename, email_dir):
-    """Save attachment data to a file in the email-specific directory"""
-    # Create attachments subdirectory within the email directory
-    attachments_dir = os.path.join(email_dir, 'attachments')
-    if not os.path.exists(attachments_dir):
-        os.makedirs(attachments_dir)
+    """Save attachment data to a file in the email-specific directory.
+    
+    The email's attachments directory and the attachment cache must already exist.
+    """
+    filepath = os.path.join(email_dir, 'attachments', filename)
+    encoded = part_data.encode('ascii')
+    
+    # Attachments seen in earlier runs are linked from the content-addressed cache.
+    # Touching the entry marks it as recently used, so eviction keeps it
+    cache_key = hashlib.blake2b(encoded, digest_size=16).hexdigest()
+    cache_path = os.path.join(ATTACHMENT_CACHE_DIR, cache_key)
+    try:
+        os.utime(cache_path)
+    except FileNotFoundError:
+        pass
+    else:
+        link_or_copy(cache_path, filepath)
+        logger.info(f"Attachment restored from cache: {filepath}")
+        return filepath
     
-    filepath = os.path.join(attachments_dir, filename)
-    with open(filepath, 'wb') as f:
-        f.write(base64.urlsafe_b64decode(part_data))
+    # Decode in chunks so the full decoded attachment is never held in memory
+    # alongside the encoded string. The data goes to a temporary file that replaces
+    # the cache entry and is then linked out; it is never written through filepath,
+    # which may still be a hard link to the cache entry of an earlier attachment
+    tmp_path = f"{cache_path}.{os.getpid()}.{threading.get_ident()}.tmp"
+    encoded = memoryview(encoded)
+    try:
+        with open(tmp_path, 'wb', buffering=WRITE_BUFFER_SIZE) as f:
+            for i in range(0, len(encoded), DECODE_CHUNK_SIZE):
+                f.write(b64decode(encoded[i:i + DECODE_CHUNK_SIZE]))
+        os.replace(tmp_path, cache_path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
     
-    print(f"✅ Attachment saved: {filepath}")
+    link_or_copy(cache_path, filepath)
+    
+    logger.info(f"Attachment saved: {filepath}")
     return filepath
 
-def extract_text(content, is_html=False):
-    """Extract readable text content from email body"""
+def prune_attachment_cache(max_bytes=ATTACHMENT_CACHE_MAX_BYTES):
+    """Evict the least recently used attachments from the cache until it fits in max_bytes.
+    
+    Emails keep their own links to evicted attachments, so only the cache entry goes away.
+    """
+    entries = []
+    total = 0
+    with os.scandir(ATTACHMENT_CACHE_DIR) as it:
+        for entry in it:
+            if entry.is_file():
+                stat = entry.stat()
+                entries.append((stat.st_mtime, stat.st_size, entry.path))
+                total += stat.st_size
+    
+    # Oldest entries first
+    entries.sort()
+    for _, size, path in entries:
+        if total <= max_bytes:
+            break
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass
+        total -= size
+
+def link_or_copy(src, dst):
+    """Hard link src to dst, falling back to a copy where links are unsupported"""
+    try:
+        os.remove(dst)
+    except FileNotFoundError:
+        pass
+    try:
+        os.link(src, dst)
+    except OSError:
+        shutil.copyfile(src, dst)
+
+def fetch_attachments(service, message_id, pending):
+    """Fetch attachment data for (filename, attachmentId) pairs using batched requests.
+    
+    Returns the attachment data in the order of pending. Raises the first fetch error
+    once its batch completes, after logging every failed attachment, so a missing
+    attachment is never silently skipped.
+    """
+    results = [None] * len(pending)
+    failures = []
+    
+    def make_callback(index, filename):
+        def callback(request_id, response, exception):
+            if exception is not None:
+                failures.append((filename, exception))
+            else:
+                results[index] = response['data']
+        return callback
+    
+    # The Gmail API accepts at most BATCH_LIMIT requests per batch
+    for i in range(0, len(pending), BATCH_LIMIT):
+        batch = service.new_batch_http_request()
+        for index in range(i, min(i + BATCH_LIMIT, len(pending))):
+            filename, attachment_id = pending[index]
+            batch.add(
+                service.users().messages().attachments().get(
+                    userId='me', messageId=message_id, id=attachment_id
+                ),
+                callback=make_callback(index, filename)
+            )
+        batch.execute()
+        
+        if failures:
+            for filename, exception in failures:
+                logger.error(f"Failed to fetch attachment {filename}: {exception}")
+            raise failures[0][1]
+    
+    return results
+
+def get_part_charset(part):
+    """Get the charset declared in a MIME part's Content-Type header, defaulting to UTF-8"""
+    for header in part.get('headers', []):
+        if header['name'].lower() == 'content-type':
+            match = CHARSET_PATTERN.search(header['value'])
+            if match:
+                return match.group(1)
+    return 'utf-8'
+
+def decode_body(data, charset='utf-8'):
+    """Decode raw body bytes to text, falling back to UTF-8 for unknown charsets"""
+    try:
+        return data.decode(charset, errors='replace')
+    except LookupError:
+        return data.decode('utf-8', errors='replace')
+
+def get_html2text():
+    """Get this thread's html2text converter, configured once on first use"""
+    converter = getattr(_H2T, 'converter', None)
+    if converter is None:
+        converter = html2text.HTML2Text()
+        converter.ignore_links = False
+        converter.ignore_images = True
+        _H2T.converter = converter
+    return converter
+
+def strip_html_tags(content):
+    """Convert HTML to plain text with compiled regex passes (no link preservation)"""
+    text = HTML_SKIP_PATTERN.sub('', content)
+    text = HTML_BREAK_PATTERN.sub('\n', text)
+    text = HTML_TAG_PATTERN.sub('', text)
+    text = html.unescape(text)
+    return BLANK_LINES_PATTERN.sub('\n\n', text).strip()
+
+def extract_text(content, is_html=False, preserve_links=False, charset='utf-8'):
+    """Extract readable text content from email body (str or raw bytes)"""
     if is_html:
-        # Convert HTML to plain text
-        h = html2text.HTML2Text()
-        h.ignore_links = False
-        h.ignore_images = True
-        return h.handle(content).strip()
+        if isinstance(content, bytes):
+            content = decode_body(content, charset)
+        
+        if SELECTOLAX_AVAILABLE and not preserve_links:
+            # Fast C-backed HTML stripping when link targets are not needed
+            tree = LexborHTMLParser(content)
+            tree.strip_tags(['script', 'style'])
+            node = tree.body if tree.body is not None else tree.root
+            return node.text(separator='\n').strip() if node is not None else ""
+        
+        if not preserve_links:
+            return strip_html_tags(content)
+        
+        # Convert HTML to plain text, keeping links. A converter holds parser state
+        # while handling a document, so each thread reuses its own
+        return get_html2text().handle(content).strip()
+    
+    if isinstance(content, bytes):
+        content = decode_body(content, charset)
     return content.strip()
 
-def get_most_recent_email():
-    """Get the most recent email's body and attachments"""
+def get_most_recent_email(fetch_body=True):
+    """Get the most recent email's body and attachments.
+    
+    When fetch_body is False only the headers and snippet are downloaded; the snippet
+    is returned as the body, and no email directory or attachments are created.
+    """
     service = get_gmail_service()
-    results = service.users().messages().list(userId='me', maxResults=1).execute()
+    results = service.users().messages().list(userId='me', maxResults=1, fields='messages/id').execute()
     messages = results.get('messages', [])
 
     if not messages:
         print("No messages found.")
         return None, [], None, None, None
     
-    msg = service.users().messages().get(userId='me', id=messages[0]['id'], format='full').execute()
-    headers = msg['payload']['headers']
-    subject = next((h['value'] for h in headers if h['name'].lower() == 'subject'), "No Subject")
-    sender = next((h['value'] for h in headers if h['name'].lower() == 'from'), "Unknown Sender")
+    if fetch_body:
+        # Only the payload and internal date are used, so skip the other message fields
+        msg = service.users().messages().get(
+            userId='me', id=messages[0]['id'], format='full', fields='internalDate,payload'
+        ).execute()
+    else:
+        # Metadata only: skip the MIME tree entirely
+        msg = service.users().messages().get(
+            userId='me', id=messages[0]['id'], format='metadata',
+            metadataHeaders=['Subject', 'From', 'Date'], fields='internalDate,snippet,payload/headers'
+        ).execute()
+    
+    # Build a case-insensitive header lookup once instead of scanning per header
+    headers = {h['name'].lower(): h['value'] for h in msg['payload'].get('headers', [])}
+    subject = headers.get('subject', "No Subject")
+    sender = headers.get('from', "Unknown Sender")
     
     # Get date from email headers or from the message internal date
-    date_str = next((h['value'] for h in headers if h['name'].lower() == 'date'), None)
+    date_str = headers.get('date')
     if date_str:
         try:
             # Try to parse the email date header
@@ -134,86 +370,71 @@ def get_most_recent_email():
     print(f"📩 From: {sender}")
     print(f"📌 Subject: {subject}")
     print(f"📅 Date: {date_obj}")
+    
+    if not fetch_body:
+        return msg.get('snippet', ""), [], None, sender, subject
 
     # Create directory for this email
     email_dir = create_email_directory(sender, subject, date_obj)
     print(f"📁 Email directory created: {email_dir}")
+    
+    # Create the attachment folders once instead of checking for them per attachment
+    os.makedirs(os.path.join(email_dir, 'attachments'), exist_ok=True)
+    os.makedirs(ATTACHMENT_CACHE_DIR, exist_ok=True)
 
-    # Process body and attachments
-    parts = msg['payload'].get('parts', [])
-    plain_text_body = ""
-    html_body = ""
-    attachments = []
-    
-    if parts:
-        # Process all parts
-        for part in parts:
-            mime_type = part.get('mimeType', '')
-            
-            if mime_type == 'text/plain' and 'data' in part['body']:
-                # Plain text body
-                body_data = part['body']['data']
-                plain_text_body = base64.urlsafe_b64decode(body_data).decode()
-            elif mime_type == 'text/html' and 'data' in part['body']:
-                # HTML body (backup if no plain text is found)
-                body_data = part['body']['data']
-                html_body = base64.urlsafe_b64decode(body_data).decode()
-            elif 'filename' in part and part['filename']:
-                # This is an attachment
-                if 'data' in part['body']:
-                    attachment_data = part['body']['data']
-                else:
-                    # If attachment data is in a separate part
-                    attachment_id = part['body']['attachmentId']
-                    attachment = service.users().messages().attachments().get(
-                        userId='me', messageId=messages[0]['id'], id=attachment_id
-                    ).execute()
-                    attachment_data = attachment['data']
-                
-                filename = part['filename']
-                saved_path = save_attachment(attachment_data, filename, email_dir)
-                attachments.append(saved_path)
-            elif 'parts' in part:
-                # Handle nested parts (like multipart/alternative)
-                for subpart in part['parts']:
-                    sub_mime_type = subpart.get('mimeType', '')
-                    
-                    if sub_mime_type == 'text/plain' and 'data' in subpart['body']:
-                        body_data = subpart['body']['data']
-                        plain_text_body = base64.urlsafe_b64decode(body_data).decode()
-                    elif sub_mime_type == 'text/html' and 'data' in subpart['body']:
-                        body_data = subpart['body']['data']
-                        html_body = base64.urlsafe_b64decode(body_data).decode()
-                    elif 'filename' in subpart and subpart['filename']:
-                        # This is an attachment in a nested part
-                        if 'data' in subpart['body']:
-                            attachment_data = subpart['body']['data']
-                        else:
-                            attachment_id = subpart['body']['attachmentId']
-                            attachment = service.users().messages().attachments().get(
-                                userId='me', messageId=messages[0]['id'], id=attachment_id
-                            ).execute()
-                            attachment_data = attachment['data']
-                        
-                        filename = subpart['filename']
-                        saved_path = save_attachment(attachment_data, filename, email_dir)
-                        attachments.append(saved_path)
-    else:
-        # Handle messages with no parts structure
-        mime_type = msg['payload'].get('mimeType', '')
-        body_data = msg['payload']['body']['data']
-        decoded_data = base64.urlsafe_b64decode(body_data).decode()
+    # Process body and attachments with an iterative walk over the MIME tree,
+    # so arbitrarily nested multipart messages are handled by a single code path.
+    # Bodies are kept as raw bytes with their charset and only decoded when rendered
+    bodies = {'text/plain': None, 'text/html': None}
+    # (filename, data) in MIME order; data of separately stored attachments is filled in after fetching
+    attachment_parts = []
+    pending_attachments = []
+    pending_positions = []
+    
+    stack = [msg['payload']]
+    while stack:
+        part = stack.pop()
+        
+        if 'parts' in part:
+            # Push children in reverse so they are visited in document order
+            stack.extend(reversed(part['parts']))
+            continue
         
-        if mime_type == 'text/plain':
-            plain_text_body = decoded_data
-        elif mime_type == 'text/html':
-            html_body = decoded_data
+        part_body = part.get('body', {})
+        filename = part.get('filename')
+        
+        if filename:
+            # This is an attachment
+            if 'data' in part_body:
+                attachment_parts.append((filename, part_body['data']))
+            else:
+                # Attachment data is stored separately, fetch it later in a batch
+                pending_positions.append(len(attachment_parts))
+                pending_attachments.append((filename, part_body['attachmentId']))
+                attachment_parts.append((filename, None))
+        elif part.get('mimeType') in bodies and 'data' in part_body:
+            bodies[part['mimeType']] = (b64decode(part_body['data']), get_part_charset(part))
+    
+    # Fetch all non-inline attachments in as few round trips as possible
+    fetched = fetch_attachments(service, messages[0]['id'], pending_attachments)
+    for position, attachment_data in zip(pending_positions, fetched):
+        attachment_parts[position] = (attachment_parts[position][0], attachment_data)
+    
+    # Save in MIME order so attachment numbering matches the message
+    attachments = [
+        save_attachment(attachment_data, filename, email_dir)
+        for filename, attachment_data in attachment_parts
+    ]
+    
+    prune_attachment_cache()
     
     # Determine the body to display (prefer plain text)
-    if plain_text_body:
-        body = extract_text(plain_text_body)
-    elif html_body:
-        body = extract_text(html_body, is_html=True)
+    if bodies['text/plain'] and bodies['text/plain'][0]:
+        plain_data, charset = bodies['text/plain']
+        body = extract_text(plain_data, charset=charset)
+    elif bodies['text/html'] and bodies['text/html'][0]:
+        html_data, charset = bodies['text/html']
+        body = extract_text(html_data, is_html=True, charset=charset)
     else:
         body = "No readable content found in this email."
 
@@ -242,38 +463,42 @@ def main():
     processor = PropertyProcessor()
     
     # Step 2: Convert attachments to text
-    attachment_texts = []
+    documents = []
     for i, attachment_path in enumerate(attachments, 1):
-        print(f"Processing attachment {i}: {os.path.basename(attachment_path)}")
+        logger.info(f"Processing attachment {i}: {os.path.basename(attachment_path)}")
         # Only process document files that can be converted to text
         if attachment_path.lower().endswith(('.pdf', '.docx', '.doc', '.txt', '.rtf')):
-            text = processor.extract_text_from_document(attachment_path)
-            attachment_texts.append((os.path.basename(attachment_path), text))
-            
-            # Save the extracted text to a file
-            text_filename = f"{os.path.splitext(os.path.basename(attachment_path))[0]}_text.txt"
-            text_path = os.path.join(email_dir, text_filename)
-            with open(text_path, "w") as f:
-                f.write(text)
-    
-    # Step 3: Combine all content into a single string
-    combined_text = f"body: {body}\n\n"
+            documents.append(attachment_path)
     
-    for i, (filename, text) in enumerate(attachment_texts, 1):
-        combined_text += f"attachment {i} ({filename}): {text}\n\n"
+    # The conversions are independent and mostly wait on GPT, so run them on worker
+    # threads; map keeps the results in attachment order
+    with ThreadPoolExecutor(max_workers=EXTRACTION_WORKERS) as executor:
+        texts = list(executor.map(processor.extract_text_from_document, documents))
     
-    # Step 4: Feed the combined text to the property processor
-    print("Processing combined text with property processor...")
+    attachment_texts = []
+    for attachment_path, text in zip(documents, texts):
+        attachment_texts.append((os.path.basename(attachment_path), text))
+        
+        # Save the extracted text to a file
+        text_filename = f"{os.path.splitext(os.path.basename(attachment_path))[0]}_text.txt"
+        text_path = os.path.join(email_dir, text_filename)
+        with open(text_path, "w") as f:
+            f.write(text)
     
-    # Save the combined text for processing
+    # Step 3: Combine all content into a single file for processing, writing each
+    # part as it comes rather than building the combined string in memory first
     combined_text_path = os.path.join(email_dir, "combined_email_content.txt")
     with open(combined_text_path, "w") as f:
-        f.write(combined_text)
+        f.write(f"body: {body}\n\n")
+        for i, (filename, text) in enumerate(attachment_texts, 1):
+            f.write(f"attachment {i} ({filename}): {text}\n\n")
+    
+    # Step 4: Feed the combined text to the property processor
+    print("Processing combined text with property processor...")
     
     # Create output directory inside email directory
     output_dir = os.path.join(email_dir, "output")
-    if not os.path.exists(output_dir):
-        os.makedirs(output_dir)
+    os.makedirs(output_dir, exist_ok=True)
     
     # Process the combined text
     result = process_property_document(
@@ -6,6 +6,7 @@ creating structured JSON data, and enriching it with missing information.
 
 import os
 import json
+import orjson
 import logging
 import uuid
 from typing import Dict, Any, Optional, List, Tuple
@@ -22,6 +23,10 @@ from src.scripts.data_enricher import DataEnricher
 from src.scripts.json_restructurer import JSONRestructurer
 from src.scripts.utils import FileManager
 
+# Maximum number of instructions sent to GPT in one request, so a bad or truncated
+# response only fails its own batch instead of every instruction
+MAX_INSTRUCTION_BATCH_SIZE = 25
+
 class PropertyProcessor:
     """Unified interface for processing property documents and data.
     
@@ -140,7 +145,7 @@ class PropertyProcessor:
         
         return restructured_data
     
-    def ensure_model_ids(self, data: Dict[str, Any]) -> Dict[str, Any]:
+    def ensure_model_ids(self, data: Dict[str, Any], in_place: bool = False) -> Dict[str, Any]:
         """Ensure all models have unique IDs and properly reference each other.
         
         This method recursively traverses the JSON structure and:
@@ -149,6 +154,8 @@ class PropertyProcessor:
         
         Args:
             data: The JSON data to process
+            in_place: Whether to modify data directly instead of working on a deep copy.
+                Use this when the caller owns data, e.g. freshly parsed GPT output
             
         Returns:
             The updated JSON data with proper IDs and references
@@ -157,66 +164,61 @@ class PropertyProcessor:
             """Generate a unique ID string."""
             return str(uuid.uuid4())
         
-        def process_object(obj: Dict[str, Any], parent_key: str = "") -> Dict[str, Any]:
-            """Process an object to ensure it has an ID and proper references."""
-            if not isinstance(obj, dict):
-                return obj
-                
-            # Add ID if missing
-            if "id" in obj and not obj["id"]:
-                obj["id"] = generate_id()
-                
-            # Get a list of keys to safely iterate over
-            keys = list(obj.keys())
+        def process_tree(root: Dict[str, Any]) -> None:
+            """Ensure every object in the tree has an ID and proper references.
             
-            # Process nested objects and maintain ID references
-            for key in keys:
-                value = obj[key]
-                # Skip null values
-                if value is None:
-                    continue
-                    
-                # Process nested objects
-                if isinstance(value, dict):
-                    # Add ID reference if the field ends with 'Id' and the corresponding object exists
-                    ref_field = f"{key}Id"
-                    if ref_field not in obj and "id" in value:
-                        obj[ref_field] = value["id"] if value["id"] else generate_id()
-                        if not value["id"]:
-                            value["id"] = obj[ref_field]
-                            
-                    # Recursively process the nested object
-                    obj[key] = process_object(value, key)
-                    
-                # Process lists
-                elif isinstance(value, list):
-                    # Handle list of objects
-                    new_list = []
-                    ids_list = []
+            Walks the tree with an explicit stack instead of recursing into each
+            nested object, so deeply nested data doesn't pay per-level call overhead.
+            """
+            stack = [root]
+            while stack:
+                obj = stack.pop()
+                
+                # Add ID if missing
+                if "id" in obj and not obj["id"]:
+                    obj["id"] = generate_id()
                     
-                    for item in value:
-                        if isinstance(item, dict):
-                            processed_item = process_object(item, key)
-                            if "id" in processed_item and processed_item["id"]:
-                                ids_list.append(processed_item["id"])
-                            new_list.append(processed_item)
-                        else:
-                            new_list.append(item)
-                            
-                    obj[key] = new_list
+                # Process nested objects and maintain ID references, iterating over
+                # a snapshot of the keys since reference fields are added on the way
+                for key in list(obj.keys()):
+                    value = obj[key]
                     
-                    # Add reference list if missing
-                    list_ref_field = f"{key}Ids"
-                    if ids_list and list_ref_field not in obj:
-                        obj[list_ref_field] = ids_list
+                    # Process nested objects
+                    if isinstance(value, dict):
+                        # Add ID reference if the field ends with 'Id' and the corresponding object exists
+                        ref_field = f"{key}Id"
+                        if ref_field not in obj and "id" in value:
+                            obj[ref_field] = value["id"] if value["id"] else generate_id()
+                            if not value["id"]:
+                                value["id"] = obj[ref_field]
+                                
+                        stack.append(value)
                         
-            return obj
+                    # Process lists of objects
+                    elif isinstance(value, list):
+                        ids_list = []
+                        for item in value:
+                            if isinstance(item, dict):
+                                if "id" in item and not item["id"]:
+                                    item["id"] = generate_id()
+                                if item.get("id"):
+                                    ids_list.append(item["id"])
+                                stack.append(item)
+                                
+                        # Add reference list if missing
+                        list_ref_field = f"{key}Ids"
+                        if ids_list and list_ref_field not in obj:
+                            obj[list_ref_field] = ids_list
             
-        # Make a deep copy of the data to avoid modifying the original
-        data_copy = json.loads(json.dumps(data))
+        # Make a deep copy of the data to avoid modifying the original, unless the
+        # caller owns it and the full-tree serialize/parse round trip can be skipped
+        if not in_place:
+            data = orjson.loads(orjson.dumps(data))
         
         # Start processing from the root
-        return process_object(data_copy)
+        if isinstance(data, dict):
+            process_tree(data)
+        return data
         
     def apply_instructions_to_json(self, 
                                   json_data: Dict[str, Any], 
@@ -238,25 +240,40 @@ class PropertyProcessor:
         """
         logger.info("Applying instructions to JSON data")
         
-        # Create a JSONUpdater instance
-        data_manager = JSONUpdater()
-        
         # Extract instructions list
         instruction_list = instructions.get("instructions", []) if instructions else []
         
         if not instruction_list:
             logger.warning("No instructions to apply")
+            json_data = self.ensure_model_ids(json_data)
+            if save_path:
+                FileManager.save_json(save_path, json_data)
             return json_data, {"success": True, "failed_instructions": [], "messages": ["No instructions to apply"]}
         
+        # Drop repeated instructions, keeping the first occurrence of each, so the same
+        # update isn't applied twice. Non-string instructions are keyed by their JSON
+        seen = set()
+        unique_instructions = []
+        for instruction in instruction_list:
+            key = instruction if isinstance(instruction, str) else json.dumps(instruction, sort_keys=True)
+            if key not in seen:
+                seen.add(key)
+                unique_instructions.append(instruction)
+        if len(unique_instructions) < len(instruction_list):
+            logger.info(f"Skipping {len(instruction_list) - len(unique_instructions)} duplicate instructions")
+        instruction_list = unique_instructions
+        
         logger.info(f"Processing {len(instruction_list)} instructions with batch_size={batch_size}")
         
         # Process instructions in batches
-        updated_data, failed_instructions, messages = data_manager.update_json_batch(
-            json_data.copy(), instruction_list, batch_size
+        updated_data, failed_instructions, messages = self.data_manager.update_json_batch(
+            json_data, instruction_list, batch_size
         )
         
-        # Ensure all models have proper IDs and references
-        updated_data = self.ensure_model_ids(updated_data)
+        # Ensure all models have proper IDs and references. The batch returns freshly
+        # parsed JSON, but falls back to the input when every batch fails, so only
+        # skip the defensive copy when a new object was returned
+        updated_data = self.ensure_model_ids(updated_data, in_place=updated_data is not json_data)
         
         # Format results
         results = {
@@ -362,8 +379,12 @@ class PropertyProcessor:
         # Step 3: Apply instructions to create/update JSON
         json_path = os.path.join(output_dir, f"{base_name}.json")
         failed_path = os.path.join(output_dir, f"{base_name}_failed_instructions.json") if save_intermediates else None
+        
+        # Send instructions in as few GPT round trips as the batch size cap allows
+        instruction_count = len(instructions.get("instructions", []))
         json_data, results = self.apply_instructions_to_json(
-            self.template.copy(), instructions, json_path, failed_path
+            self.template.copy(), instructions, json_path, failed_path,
+            batch_size=min(max(instruction_count, 1), MAX_INSTRUCTION_BATCH_SIZE)
         )
         
         if not json_data or not results["success"]:
@@ -378,43 +399,25 @@ class PropertyProcessor:
             logger.info(f"Found {len(enrichment_instructions)} enrichment instructions")
             enriched_path = os.path.join(output_dir, f"{base_name}_enriched.json")
             
-            # Process enrichment instructions in a batch to prevent duplication
-            batch_size = min(10, len(enrichment_instructions))
-            enriched_data, enrichment_results = self.apply_instructions_to_json(
+            # Each batch depends on the JSON returned by the previous one, so batches
+            # cannot run concurrently; use as few as the batch size cap allows
+            batch_size = min(len(enrichment_instructions), MAX_INSTRUCTION_BATCH_SIZE)
+            json_data, enrichment_results = self.apply_instructions_to_json(
                 json_data, 
                 {"instructions": enrichment_instructions}, 
                 enriched_path,
                 batch_size=batch_size
             )
-            
-            # Final step: Ensure all models have proper IDs and references
-            enriched_data = self.ensure_model_ids(enriched_data)
-            
-            # Save the final enriched data with proper IDs
-            if save_intermediates:
-                FileManager.save_json(enriched_path, enriched_data)
-            
-            # Step 5: Restructure the JSON if requested
-            if restructure_output:
-                restructured_path = os.path.join(output_dir, f"{base_name}_restructured.json")
-                restructured_data = self.restructure_json(enriched_data, restructured_path)
-                return restructured_data
-            else:
-                return enriched_data
-        else:
-            # Ensure all models have proper IDs and references as a final step
-            json_data = self.ensure_model_ids(json_data)
-            
-            # Re-save the JSON with proper IDs
-            FileManager.save_json(json_path, json_data)
-            
-            # Step 5: Restructure the JSON if requested
-            if restructure_output:
-                restructured_path = os.path.join(output_dir, f"{base_name}_restructured.json")
-                restructured_data = self.restructure_json(json_data, restructured_path)
-                return restructured_data
-            else:
-                return json_data
+        
+        # The final data has already been saved with proper IDs by apply_instructions_to_json,
+        # so it is not written again here
+        
+        # Step 5: Restructure the JSON if requested
+        if restructure_output:
+            restructured_path = os.path.join(output_dir, f"{base_name}_restructured.json")
+            return self.restructure_json(json_data, restructured_path)
+        
+        return json_data
 
 # Convenience function for direct use
 def process_property_document(document_path: str, 
@@ -12,6 +12,7 @@ Key benefits:
 import os
 import sys
 import json
+import orjson
 import logging
 import traceback
 from typing import Dict, Any, List, Optional, Tuple, Union
@@ -22,7 +23,7 @@ if parent_dir not in sys.path:
     sys.path.append(parent_dir)
 
 # Import utils for GPT client
-from .utils import GPTClient, get_data_models_description, generate_json_schema_from_dataclasses
+from .utils import get_gpt_client, FileManager, get_data_models_description, generate_json_schema_from_dataclasses
 
 # Configure logging
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
@@ -33,7 +34,7 @@ class JSONUpdater:
     
     def __init__(self):
         """Initialize the JSONUpdater."""
-        self.gpt_client = GPTClient()
+        self.gpt_client = get_gpt_client()
     
     def update_json(self, data: Dict[str, Any], instruction: str) -> Tuple[Dict[str, Any], bool, str]:
         """Update JSON data based on a natural language instruction.
@@ -68,7 +69,7 @@ The property management system uses the following data models:
 
 Current data:
 ```json
-{json.dumps(data, indent=2)}
+{orjson.dumps(data).decode()}
 ```
 
 Your task is to update the above JSON data based on this instruction:
@@ -107,7 +108,7 @@ Guidelines:
                 
             # Parse the response as JSON
             try:
-                updated_data = json.loads(response_content)
+                updated_data = orjson.loads(response_content)
                 logger.info("Successfully processed instruction and received updated JSON")
                 return updated_data, True, f"Successfully updated JSON based on instruction: {instruction}"
             except json.JSONDecodeError as e:
@@ -209,7 +210,7 @@ The property management system uses the following data models:
 
 Current data:
 ```json
-{json.dumps(data, indent=2)}
+{orjson.dumps(data).decode()}
 ```
 
 Your task is to update the above JSON data based on the following batch of instructions:
@@ -257,7 +258,7 @@ Guidelines:
                     
                 # Parse the response as JSON
                 try:
-                    updated_data = json.loads(response_content)
+                    updated_data = orjson.loads(response_content)
                     logger.info(f"Successfully processed batch of {len(batch)} instructions")
                     messages.append(f"Successfully processed batch of {len(batch)} instructions")
                     data = updated_data  # Update data for next batch
@@ -287,8 +288,10 @@ Guidelines:
         Returns:
             Dictionary with results including success, failed instructions, and messages
         """
-        # Load the JSON data
+        # Load the JSON data, keeping the loaded object to detect no-op updates.
+        # Updates return new objects, so the loaded data itself is never modified
         data = self.load_json(json_file_path)
+        original_data = data
         
         # Initialize results
         results = {
@@ -358,8 +361,10 @@ Guidelines:
                         "error": str(e)
                     })
         
-        # Save the updated data
-        if results["success"] or (results["failed_instructions"] and len(results["failed_instructions"]) < len(instructions)):
+        # Save the updated data, unless the instructions left it unchanged
+        if data == original_data:
+            logger.info(f"Data unchanged, not rewriting {json_file_path}")
+        elif results["success"] or (results["failed_instructions"] and len(results["failed_instructions"]) < len(instructions)):
             # Only save if at least one instruction succeeded
             if not self.save_json(json_file_path, data):
                 results["success"] = False
@@ -376,17 +381,7 @@ Guidelines:
         Returns:
             Dictionary containing the JSON data, or empty dict if loading fails
         """
-        try:
-            if not os.path.exists(file_path):
-                logger.warning(f"File not found: {file_path}")
-                return {}
-                
-            with open(file_path, 'r') as f:
-                return json.load(f)
-        except Exception as e:
-            logger.error(f"Error loading JSON from {file_path}: {str(e)}")
-            logger.error(traceback.format_exc())
-            return {}
+        return FileManager.load_json(file_path)
     
     def save_json(self, file_path: str, data: Dict[str, Any]) -> bool:
         """Save JSON data to a file.
@@ -398,17 +393,7 @@ Guidelines:
         Returns:
             bool: True if save was successful
         """
-        try:
-            # Ensure directory exists
-            os.makedirs(os.path.dirname(os.path.abspath(file_path)), exist_ok=True)
-            
-            with open(file_path, 'w') as f:
-                json.dump(data, f, indent=2)
-            return True
-        except Exception as e:
-            logger.error(f"Error saving JSON to {file_path}: {str(e)}")
-            logger.error(traceback.format_exc())
-            return False
+        return FileManager.save_json(file_path, data)
 
 # Simple helper function for direct use
 def update_json_with_instruction(data: Dict[str, Any], instruction: str) -> Tuple[Dict[str, Any], bool, str]:
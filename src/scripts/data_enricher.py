@@ -5,10 +5,12 @@ and uses GPT to identify and suggest enrichment instructions.
 """
 
 import os
-import json
+import re
 import sys
 import logging
 import traceback
+import hashlib
+import orjson
 from pathlib import Path
 from typing import List, Dict, Any, Optional, Tuple
 
@@ -18,12 +20,68 @@ if parent_dir not in sys.path:
     sys.path.append(parent_dir)
 
 # Import utils directly
-from .utils import GPTClient, FileManager, get_data_models_description
+from .utils import get_gpt_client, FileManager, get_data_models_description
 
 # Configure logging
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
 
+# Matches a numbered line such as "3. Update the zip code" and captures the instruction
+_NUMBERED_LINE_PATTERN = re.compile(r'^[ \t]*\d+\.[ \t]+(.*\S)', re.MULTILINE)
+
+# Fixed segments of the enrichment prompt, joined around the data models
+# description, the current JSON data and the original text data
+_PROMPT_HEAD = """You are a property management data analyst. Your task is to analyze the current property data (in JSON format) and the original input data (in text format) to identify missing or incomplete information that could be filled in, as well as to identify and correct any errors in the existing data.
+
+The property management system uses the following data models:
+"""
+
+_PROMPT_INSTRUCTIONS = """
+
+Please look for:
+1. Missing information in the JSON that is present in the text data (e.g., payment dates, contact information)
+2. Incomplete fields in the JSON (e.g., addresses missing zip codes)
+3. Inconsistencies between the JSON and text data
+4. Errors in the JSON data that need to be corrected (e.g., incorrect zip codes, wrong tenant names)
+5. Any other information that could be inferred or derived from the existing data
+
+CRITICAL GUIDELINES TO PREVENT DUPLICATION:
+1. DO NOT create duplicate data structures. Always update existing ones.
+2. DO NOT add new properties, units, tenants or leases unless they are completely missing from the JSON.
+3. DO NOT create redundant fields or arrays that already exist in the JSON.
+4. When property, unit, tenant, or lease records already exist, update their existing fields instead of creating new records.
+5. DO NOT create duplicate arrays or nested structures when they already exist in the JSON schema.
+6. If a field already contains a value, only update it if the value is incorrect or incomplete.
+7. Use ID reference fields to link entities rather than creating nested duplicates.
+
+IMPORTANT: Be very careful about making inferences. Do not assume that information about one entity (like an owner) applies to another entity (like a property) unless there is clear evidence. For example, the owner's address zip code should not be applied to the property address unless there is explicit evidence they are the same location.
+
+For each issue you identify, provide a clear explanation and suggestion for how to fix it.
+
+Current JSON data:
+```json
+"""
+
+_PROMPT_TEXT_HEADER = """
+```
+
+Original text data:
+```
+"""
+
+_PROMPT_TAIL = """
+```
+
+Based on your analysis, provide a list of specific updates that should be made to enrich the data and correct any errors. Format your response as a series of natural language instructions that could be processed by a property management system.
+
+For example:
+1. Update the zip code for property address to 06525
+2. Set lease due date for unit 167 to the 15th of each month
+3. Add phone number 203-250-0285 for tenant Sherry in unit 165
+4. Correct the property zip code from 10960 to 06525 as it was incorrectly set to the owner's zip code
+
+Only include instructions for information that is missing, incorrect, or inconsistent based on the available data. Each instruction should modify only one field at a time to avoid duplication."""
+
 class DataEnricher:
     """Analyzes property data and suggests enrichment instructions.
     
@@ -33,8 +91,10 @@ class DataEnricher:
     """
     
     def __init__(self):
-        """Initialize the data enricher with OpenAI client."""
-        self.gpt_client = GPTClient()
+        """Initialize the data enricher with the shared OpenAI client."""
+        self.gpt_client = get_gpt_client()
+        # Suggestions keyed by prompt hash, so identical prompts don't re-query GPT
+        self._suggestion_cache: Dict[str, Tuple[str, List[str]]] = {}
         
     def generate_enrichment_instructions(self, json_path: str, text_path: str, save_suggestions: bool = True) -> List[str]:
         """Analyze JSON and text data to generate enrichment instructions.
@@ -102,53 +162,24 @@ class DataEnricher:
             # Provide a generic description if data models can't be loaded
             data_models_description = "Property management data including properties, units, tenants, leases, and related information."
         
-        return f"""You are a property management data analyst. Your task is to analyze the current property data (in JSON format) and the original input data (in text format) to identify missing or incomplete information that could be filled in, as well as to identify and correct any errors in the existing data.
-
-The property management system uses the following data models:
-{data_models_description}
-
-Please look for:
-1. Missing information in the JSON that is present in the text data (e.g., payment dates, contact information)
-2. Incomplete fields in the JSON (e.g., addresses missing zip codes)
-3. Inconsistencies between the JSON and text data
-4. Errors in the JSON data that need to be corrected (e.g., incorrect zip codes, wrong tenant names)
-5. Any other information that could be inferred or derived from the existing data
-
-CRITICAL GUIDELINES TO PREVENT DUPLICATION:
-1. DO NOT create duplicate data structures. Always update existing ones.
-2. DO NOT add new properties, units, tenants or leases unless they are completely missing from the JSON.
-3. DO NOT create redundant fields or arrays that already exist in the JSON.
-4. When property, unit, tenant, or lease records already exist, update their existing fields instead of creating new records.
-5. DO NOT create duplicate arrays or nested structures when they already exist in the JSON schema.
-6. If a field already contains a value, only update it if the value is incorrect or incomplete.
-7. Use ID reference fields to link entities rather than creating nested duplicates.
-
-IMPORTANT: Be very careful about making inferences. Do not assume that information about one entity (like an owner) applies to another entity (like a property) unless there is clear evidence. For example, the owner's address zip code should not be applied to the property address unless there is explicit evidence they are the same location.
-
-For each issue you identify, provide a clear explanation and suggestion for how to fix it.
-
-Current JSON data:
-```json
-{json.dumps(json_data, indent=2)}
-```
-
-Original text data:
-```
-{text_data}
-```
-
-Based on your analysis, provide a list of specific updates that should be made to enrich the data and correct any errors. Format your response as a series of natural language instructions that could be processed by a property management system.
-
-For example:
-1. Update the zip code for property address to 06525
-2. Set lease due date for unit 167 to the 15th of each month
-3. Add phone number 203-250-0285 for tenant Sherry in unit 165
-4. Correct the property zip code from 10960 to 06525 as it was incorrectly set to the owner's zip code
-
-Only include instructions for information that is missing, incorrect, or inconsistent based on the available data. Each instruction should modify only one field at a time to avoid duplication."""
+        return "".join([
+            _PROMPT_HEAD,
+            data_models_description,
+            _PROMPT_INSTRUCTIONS,
+            orjson.dumps(json_data).decode(),
+            _PROMPT_TEXT_HEADER,
+            text_data,
+            _PROMPT_TAIL,
+        ])
 
     def _get_enrichment_suggestions(self, prompt: str) -> Tuple[str, List[str]]:
         """Get enrichment suggestions from GPT."""
+        cache_key = hashlib.sha256(prompt.encode('utf-8')).hexdigest()
+        if cache_key in self._suggestion_cache:
+            logger.info("Using cached enrichment suggestions for identical prompt")
+            response, instructions = self._suggestion_cache[cache_key]
+            return response, list(instructions)
+        
         try:
             logger.info("Sending data to OpenAI for analysis...")
             logger.info(f"Model: {self.gpt_client.model}")
@@ -163,6 +194,7 @@ Only include instructions for information that is missing, incorrect, or inconsi
             
             # Extract instructions from the response
             instructions = self._extract_instructions(response)
+            self._suggestion_cache[cache_key] = (response, list(instructions))
             
             return response, instructions
             
@@ -173,18 +205,8 @@ Only include instructions for information that is missing, incorrect, or inconsi
     
     def _extract_instructions(self, text: str) -> List[str]:
         """Extract numbered instructions from text."""
-        instructions = []
-        lines = text.strip().split('\n')
-        
-        # Look for lines that start with a number followed by a period
-        for line in lines:
-            if line.strip() and line.strip()[0].isdigit() and '. ' in line:
-                # Extract the instruction part (after the number and period)
-                parts = line.split('. ', 1)
-                if len(parts) > 1:
-                    instructions.append(parts[1].strip())
-        
-        return instructions
+        # Take the instruction part (after the number and period) of every numbered line
+        return [match.group(1) for match in _NUMBERED_LINE_PATTERN.finditer(text)]
     
     def _save_suggestions(self, json_path: str, suggestions_text: str, instructions: List[str]) -> None:
         """Save suggestions and instructions to files for review."""
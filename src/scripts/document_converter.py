@@ -16,7 +16,7 @@ if parent_dir not in sys.path:
     sys.path.append(parent_dir)
 
 # Import from scripts.utils
-from .utils import GPTClient, get_data_models_description
+from .utils import get_gpt_client, get_data_models_description
 
 # Document conversion libraries
 try:
@@ -41,16 +41,20 @@ except ImportError:
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
 
+# Prefixes of the messages returned in place of text when extraction fails
+EXTRACTION_FAILURE_PREFIXES = ("Error", "File not found", "Unsupported file type")
+
 def extract_text_from_pdf(file_path: str) -> str:
     """Extract text from a PDF file."""
     try:
-        text = ""
+        # Collect the page texts and join them once rather than growing a string
+        parts = []
         with open(file_path, 'rb') as file:
             reader = PyPDF2.PdfReader(file)
-            for page_num in range(len(reader.pages)):
-                page = reader.pages[page_num]
-                text += page.extract_text() + "\n\n"
-        return text
+            for page in reader.pages:
+                parts.append(page.extract_text())
+                parts.append("\n\n")
+        return "".join(parts)
     except Exception as e:
         logger.error(f"Error extracting text from PDF: {str(e)}")
         logger.error(traceback.format_exc())
@@ -76,8 +80,8 @@ def extract_text_from_excel(file_path: str) -> str:
         # Read all sheets from the Excel file
         excel_file = pd.ExcelFile(file_path)
         
-        # Initialize text output
-        text = f"Excel file: {os.path.basename(file_path)}\n\n"
+        # Initialize text output, collected in parts and joined once at the end
+        parts = [f"Excel file: {os.path.basename(file_path)}\n\n"]
         
         # Process each sheet
         for sheet_name in excel_file.sheet_names:
@@ -88,28 +92,28 @@ def extract_text_from_excel(file_path: str) -> str:
                 continue
                 
             # Add sheet name as header
-            text += f"Sheet: {sheet_name}\n"
-            text += "=" * 50 + "\n"
+            parts.append(f"Sheet: {sheet_name}\n")
+            parts.append("=" * 50 + "\n")
             
             # Fill NaN values with empty string for text representation
             df = df.fillna("")
             
             # Get column names as headers
             headers = ", ".join(str(col) for col in df.columns)
-            text += f"Headers: {headers}\n\n"
+            parts.append(f"Headers: {headers}\n\n")
             
             # Convert each row to a readable text format
             for idx, row in df.iterrows():
-                row_text = f"Row {idx+1}:\n"
+                parts.append(f"Row {idx+1}:\n")
                 for col in df.columns:
                     value = row[col]
                     if value:  # Only include non-empty values
-                        row_text += f"  {col}: {value}\n"
-                text += row_text + "\n"
+                        parts.append(f"  {col}: {value}\n")
+                parts.append("\n")
             
-            text += "\n\n"
+            parts.append("\n\n")
         
-        return text
+        return "".join(parts)
     except Exception as e:
         logger.error(f"Error extracting text from Excel file: {str(e)}")
         logger.error(traceback.format_exc())
@@ -128,6 +132,14 @@ def extract_text_using_textract(file_path: str) -> str:
         logger.error(traceback.format_exc())
         return f"Error extracting text: {str(e)}"
 
+# Extractors for the document types that are handled without textract
+TEXT_EXTRACTORS = {
+    '.pdf': extract_text_from_pdf,
+    '.docx': extract_text_from_docx,
+    '.xlsx': extract_text_from_excel,
+    '.xls': extract_text_from_excel,
+}
+
 def extract_text_from_document(file_path: str) -> str:
     """Extract text from a document based on its file extension."""
     if not os.path.exists(file_path):
@@ -145,15 +157,11 @@ def extract_text_from_document(file_path: str) -> str:
             return f"Error reading text file: {str(e)}"
     
     # Try specific extractors based on file extension
-    if file_extension == '.pdf':
-        text = extract_text_from_pdf(file_path)
-    elif file_extension == '.docx':
-        text = extract_text_from_docx(file_path)
-    elif file_extension in ['.xlsx', '.xls']:
-        if PANDAS_AVAILABLE:
-            text = extract_text_from_excel(file_path)
-        else:
-            return f"Excel support not available. Install pandas with 'pip install pandas openpyxl xlrd'."
+    extractor = TEXT_EXTRACTORS.get(file_extension)
+    if extractor is extract_text_from_excel and not PANDAS_AVAILABLE:
+        return f"Excel support not available. Install pandas with 'pip install pandas openpyxl xlrd'."
+    if extractor:
+        text = extractor(file_path)
     else:
         # Try textract as a fallback for other file types
         if TEXTRACT_AVAILABLE:
@@ -173,7 +181,7 @@ def extract_text_from_document(file_path: str) -> str:
 
 def filter_relevant_text(text: str) -> str:
     """Filter the extracted text to keep only property-related information."""
-    if not text or text.startswith("Error") or text.startswith("File not found") or text.startswith("Unsupported file type"):
+    if not text or text.startswith(EXTRACTION_FAILURE_PREFIXES):
         return text
     
     # Get data models description for context
@@ -209,7 +217,7 @@ Your response should be ONLY the extracted relevant text, with no additional exp
 Extract the relevant property management information from this document text according to the guidelines."""
 
     # Call the GPT API
-    gpt_client = GPTClient()
+    gpt_client = get_gpt_client()
     result = gpt_client.query(user_prompt, system_prompt, temperature=0.1)
     
     if not result:
@@ -234,7 +242,7 @@ def extract_relevant_text(file_path: str) -> str:
         raw_text = extract_text_from_document(file_path)
         
         # If text extraction failed, return the error
-        if raw_text.startswith("Error") or raw_text.startswith("File not found") or raw_text.startswith("Unsupported file type"):
+        if raw_text.startswith(EXTRACTION_FAILURE_PREFIXES):
             return raw_text
         
         # Filter the text to keep only relevant information
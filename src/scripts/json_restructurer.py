@@ -11,6 +11,7 @@ converting a flat structure into a hierarchical one that better represents the d
 import os
 import sys
 import json
+import orjson
 import logging
 import traceback
 from typing import Dict, Any, List, Optional, Tuple, Set
@@ -21,7 +22,7 @@ if parent_dir not in sys.path:
     sys.path.append(parent_dir)
 
 # Import utils for GPT client
-from .utils import GPTClient, get_data_models_description
+from .utils import get_gpt_client, get_data_models_description
 
 # Configure logging
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
@@ -32,7 +33,7 @@ class JSONRestructurer:
     
     def __init__(self):
         """Initialize the JSONRestructurer."""
-        self.gpt_client = GPTClient()
+        self.gpt_client = get_gpt_client()
     
     def restructure_json(self, data: Dict[str, Any]) -> Dict[str, Any]:
         """Restructure a JSON object to maximize parent-child relationships.
@@ -104,37 +105,44 @@ class JSONRestructurer:
         return relationships
     
     def _collect_entity_ids(self, obj: Any, entity_ids: Dict[str, Dict[str, Any]], path: str = ""):
-        """Recursively collect entities with IDs from the JSON structure.
+        """Collect entities with IDs from the JSON structure.
+        
+        Walks the structure with an explicit stack, tracking only the last path
+        segment since that is all the entity type is derived from.
         
         Args:
-            obj: The current object being processed
+            obj: The root object to process
             entity_ids: Dictionary to populate with entity IDs
-            path: Current path in the JSON structure
+            path: Path of the root object in the JSON structure
         """
-        if isinstance(obj, dict):
-            # Check if this is an entity with an ID
-            if 'id' in obj:
-                # Try to determine the entity type
-                entity_type = path.split('.')[-1]
-                if entity_type.endswith('s') and len(entity_type) > 1:
-                    # Singularize simple plural entity types (e.g., 'tenants' -> 'tenant')
-                    entity_type = entity_type[:-1]
-                
-                if entity_type not in entity_ids:
-                    entity_ids[entity_type] = {}
-                
-                entity_ids[entity_type][obj['id']] = obj
+        stack = [(obj, path.rpartition('.')[2])]
+        while stack:
+            obj, segment = stack.pop()
             
-            # Recursively process all fields
-            for key, value in obj.items():
-                new_path = f"{path}.{key}" if path else key
-                self._collect_entity_ids(value, entity_ids, new_path)
+            if isinstance(obj, dict):
+                # Check if this is an entity with an ID
+                if 'id' in obj:
+                    # Try to determine the entity type
+                    entity_type = segment
+                    if entity_type.endswith('s') and len(entity_type) > 1:
+                        # Singularize simple plural entity types (e.g., 'tenants' -> 'tenant')
+                        entity_type = entity_type[:-1]
+                    
+                    if entity_type not in entity_ids:
+                        entity_ids[entity_type] = {}
+                    
+                    entity_ids[entity_type][obj['id']] = obj
                 
-        elif isinstance(obj, list):
-            # Process list items
-            for i, item in enumerate(obj):
-                new_path = f"{path}[{i}]"
-                self._collect_entity_ids(item, entity_ids, new_path)
+                # Process all fields, pushed in reverse so they are visited in order
+                for key, value in reversed(obj.items()):
+                    if isinstance(value, (dict, list)):
+                        stack.append((value, key.rpartition('.')[2]))
+                    
+            elif isinstance(obj, list):
+                # Process list items, pushed in reverse so they are visited in order
+                for i in range(len(obj) - 1, -1, -1):
+                    if isinstance(obj[i], (dict, list)):
+                        stack.append((obj[i], f"{segment}[{i}]"))
     
     def _build_restructuring_prompt(self, 
                                     data: Dict[str, Any], 
@@ -171,7 +179,7 @@ I've analyzed the input JSON and found these ID relationships:
 
 Original JSON structure:
 ```json
-{json.dumps(data, indent=2)}
+{orjson.dumps(data).decode()}
 ```
 
 Please restructure this JSON to create a more hierarchical representation with nested parent-child relationships. Follow these guidelines:
@@ -224,7 +232,7 @@ Return ONLY the restructured JSON with no additional explanation or commentary.
                 
             # Parse the response as JSON
             try:
-                restructured_data = json.loads(response_content)
+                restructured_data = orjson.loads(response_content)
                 logger.info("Successfully parsed restructured JSON from OpenAI")
                 return restructured_data
             except json.JSONDecodeError as e:
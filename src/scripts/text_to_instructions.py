@@ -8,7 +8,9 @@ structured instructions based on a provided JSON schema.
 import os
 import sys
 import json
+import orjson
 import logging
+import hashlib
 import traceback
 from typing import Dict, Any, List, Optional, Union
 
@@ -18,34 +20,37 @@ if parent_dir not in sys.path:
     sys.path.append(parent_dir)
 
 # Import utils directly from the scripts package
-from .utils import GPTClient, get_data_models_description
+from .utils import get_gpt_client, FileManager, get_data_models_description
 
 # Configure logging
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
 
+# System message sent with every update prompt
+SYSTEM_MESSAGE = "You are a property management system that processes natural language updates into structured instructions."
+
 class UpdateProcessor:
     """Class for processing natural language updates into structured instructions."""
     
-    def __init__(self, schema_path: Optional[str] = None):
+    def __init__(self, schema_path: Optional[str] = None, cache_dir: Optional[str] = None):
         """Initialize the UpdateProcessor with an optional schema path.
         
         Args:
             schema_path: Path to the JSON schema file. If None, a default template will be used.
+            cache_dir: Optional directory for caching processed updates on disk across runs.
+                Entries never expire, so only enable it where stored update text may be kept.
+                If None, results are only cached in memory for the lifetime of this processor.
         """
-        self.gpt_client = GPTClient()
+        self.gpt_client = get_gpt_client()
         self.schema_path = schema_path
         self.schema = self._load_schema() if schema_path else None
+        self.cache_dir = cache_dir
+        # Serialized results, so each hit hands out an independent copy with a single parse
+        self._cache: Dict[str, bytes] = {}
         
     def _load_schema(self) -> Dict[str, Any]:
         """Load the JSON schema from the specified path."""
-        try:
-            with open(self.schema_path, 'r') as f:
-                return json.load(f)
-        except Exception as e:
-            logger.error(f"Error loading schema: {str(e)}")
-            logger.error(traceback.format_exc())
-            return {}
+        return FileManager.load_json(self.schema_path)
     
     def _create_prompt(self, text: str, schema: Optional[Dict[str, Any]] = None) -> str:
         """Create a prompt for the language model to analyze text input.
@@ -63,7 +68,7 @@ class UpdateProcessor:
             schema_context = f"""
 Current property management data:
 ```json
-{json.dumps(schema, indent=2)}
+{orjson.dumps(schema).decode()}
 ```
 """
 
@@ -110,6 +115,35 @@ Now, process this update:
 Return only the JSON object with your analysis and instructions.
 """
     
+    def _cache_key(self, prompt: str) -> str:
+        """Build a cache key from the model, the system message and the rendered prompt."""
+        digest = hashlib.blake2b(digest_size=16)
+        digest.update(self.gpt_client.model.encode('utf-8'))
+        digest.update(b'\0')
+        digest.update(SYSTEM_MESSAGE.encode('utf-8'))
+        digest.update(b'\0')
+        digest.update(prompt.encode('utf-8'))
+        return digest.hexdigest()
+    
+    def _get_cached(self, key: str) -> Optional[Dict[str, Any]]:
+        """Get a fresh copy of a previously processed update from memory or disk, if any."""
+        if key in self._cache:
+            return orjson.loads(self._cache[key])
+        if self.cache_dir:
+            cache_path = os.path.join(self.cache_dir, f"{key}.json")
+            if os.path.exists(cache_path):
+                result = FileManager.load_json(cache_path)
+                if result:
+                    self._cache[key] = orjson.dumps(result)
+                    return result
+        return None
+    
+    def _set_cached(self, key: str, result: Dict[str, Any]) -> None:
+        """Store a successfully processed update in memory and on disk."""
+        self._cache[key] = orjson.dumps(result)
+        if self.cache_dir:
+            FileManager.save_json(os.path.join(self.cache_dir, f"{key}.json"), result)
+    
     def process_update(self, text: str, schema: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
         """Process a natural language update into structured instructions.
         
@@ -127,9 +161,16 @@ Return only the JSON object with your analysis and instructions.
             # Create the prompt with the text included
             prompt = self._create_prompt(text, schema_to_use)
             
+            # An identical prompt to the same model yields the same instructions,
+            # so reuse an earlier result instead of calling GPT again
+            cache_key = self._cache_key(prompt)
+            cached = self._get_cached(cache_key)
+            if cached is not None:
+                logger.info("Using cached instructions for identical update text")
+                return cached
+            
             # Call the GPT API with system message
-            system_message = "You are a property management system that processes natural language updates into structured instructions."
-            response = self.gpt_client.query(prompt, system_message, temperature=0.1)
+            response = self.gpt_client.query(prompt, SYSTEM_MESSAGE, temperature=0.1)
             
             if not response:
                 logger.error("Failed to get a response from GPT")
@@ -137,24 +178,29 @@ Return only the JSON object with your analysis and instructions.
             
             # Try to parse the result as JSON
             try:
-                # Handle case where response might be wrapped in ```json ... ``` blocks
-                if "```json" in response:
-                    json_str = response.split("```json")[1].split("```")[0].strip()
-                elif "```" in response:
-                    json_str = response.split("```")[1].strip()
-                    if json_str.startswith("json"):
-                        json_str = json_str[4:].strip()
+                # Handle case where response might be wrapped in ```json ... ``` blocks,
+                # partitioning at the fences instead of splitting the whole response
+                _, fence, fenced = response.partition("```json")
+                if fence:
+                    json_str = fenced.partition("```")[0].strip()
                 else:
-                    json_str = response.strip()
+                    _, fence, fenced = response.partition("```")
+                    if fence:
+                        json_str = fenced.partition("```")[0].strip()
+                        if json_str.startswith("json"):
+                            json_str = json_str[4:].strip()
+                    else:
+                        json_str = response.strip()
                 
-                result = json.loads(json_str)
+                result = orjson.loads(json_str)
                 
                 # Validate the response structure
                 if "analysis" not in result or "instructions" not in result:
                     logger.error("Error: Invalid response structure from GPT")
                     return {"error": "Invalid response structure", "raw_response": response}
                 
-                # Return the result directly without parsing
+                # Return the result directly; the cache keeps its own serialized copy
+                self._set_cached(cache_key, result)
                 return result
                 
             except json.JSONDecodeError:
@@ -168,7 +214,7 @@ Return only the JSON object with your analysis and instructions.
                     
                     if start_idx >= 0 and end_idx > start_idx:
                         json_str = response[start_idx:end_idx]
-                        json_result = json.loads(json_str)
+                        json_result = orjson.loads(json_str)
                         return json_result
                 except:
                     pass
@@ -2,13 +2,17 @@
 
 import os
 import json
-from typing import Dict, Any, Optional, List, Tuple, Callable
+import mmap
+import orjson
+from typing import Dict, Any, Optional, List, Tuple, Callable, Mapping
+from types import MappingProxyType
 from pathlib import Path
 import ast
 import openai
 from dotenv import load_dotenv
 import logging
 import traceback
+from functools import lru_cache
 
 # Configure logging
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
@@ -17,6 +21,9 @@ logger = logging.getLogger(__name__)
 # Load environment variables
 load_dotenv()
 
+# JSON files larger than this are memory-mapped for parsing instead of read into memory
+JSON_MMAP_THRESHOLD = 1 << 20
+
 class GPTClient:
     """Wrapper for OpenAI API client with common functionality."""
     
@@ -99,7 +106,7 @@ class GPTClient:
                 # Remove code blocks if present
                 if response.startswith('```'):
                     logger.debug("Removing code block markers from response")
-                    response = response.split('```')[1]
+                    response = response[3:].partition('```')[0]
                     if response.startswith('python'):
                         response = response[6:]
                 response = response.strip()
@@ -129,6 +136,19 @@ class GPTClient:
         return None
 
 
+@lru_cache(maxsize=None)
+def get_gpt_client(model: Optional[str] = None) -> GPTClient:
+    """Get a shared GPTClient for the given model, creating it on first use.
+    
+    Args:
+        model: Optional model name. If None, uses the GPT_MODEL env var or a default.
+        
+    Returns:
+        A GPTClient instance shared by all callers requesting the same model
+    """
+    return GPTClient(model)
+
+
 class FileManager:
     """Utility class for file operations."""
     
@@ -143,8 +163,13 @@ class FileManager:
             Dictionary containing the JSON data or empty dict if loading fails
         """
         try:
-            with open(file_path, 'r') as f:
-                return json.load(f)
+            # Parse the raw bytes in one C-level pass, straight from the page cache
+            # for large files to avoid copying them into a bytes object first
+            with open(file_path, 'rb') as f:
+                if os.fstat(f.fileno()).st_size > JSON_MMAP_THRESHOLD:
+                    with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm, memoryview(mm) as view:
+                        return orjson.loads(view)
+                return orjson.loads(f.read())
         except FileNotFoundError:
             logger.warning(f"File not found: {file_path}")
             return {}
@@ -157,27 +182,62 @@ class FileManager:
             return {}
     
     @staticmethod
-    def save_json(file_path: str, data: Dict[str, Any], indent: int = 2) -> bool:
-        """Save JSON data to file.
+    def save_json(file_path: str, data: Dict[str, Any], indent: int = 2, durable: bool = False) -> bool:
+        """Save JSON data to file atomically.
+        
+        The data is serialized in one pass, written with a single write to a temporary
+        file next to the target, and moved into place with os.replace so readers never
+        see a partially written file. If the file already holds exactly the serialized
+        data, it is left untouched.
         
         Args:
             file_path: Path to save the JSON file
             data: Dictionary to save as JSON
             indent: Indentation level for the JSON file
+            durable: Whether to fsync the file before moving it into place, so the
+                new contents survive a crash or power loss
             
         Returns:
             True if saving was successful, False otherwise
         """
+        tmp_path = f"{file_path}.tmp"
         try:
             # Ensure directory exists
             os.makedirs(os.path.dirname(os.path.abspath(file_path)), exist_ok=True)
             
-            with open(file_path, 'w') as f:
-                json.dump(data, f, indent=indent)
+            # orjson only supports two-space indentation
+            if indent == 2:
+                buf = orjson.dumps(data, option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS)
+            else:
+                buf = json.dumps(data, indent=indent).encode('utf-8')
+            
+            # Skip the write when nothing changed, checking the size before reading
+            if FileManager._has_contents(file_path, buf):
+                return True
+            
+            with open(tmp_path, 'wb') as f:
+                f.write(buf)
+                if durable:
+                    f.flush()
+                    os.fsync(f.fileno())
+            os.replace(tmp_path, file_path)
             return True
         except Exception as e:
             logger.error(f"Error saving JSON data: {str(e)}")
             logger.error(traceback.format_exc())
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            return False
+    
+    @staticmethod
+    def _has_contents(file_path: str, buf: bytes) -> bool:
+        """Check whether a file exists and holds exactly the given bytes."""
+        try:
+            if os.path.getsize(file_path) != len(buf):
+                return False
+            with open(file_path, 'rb') as f:
+                return f.read() == buf
+        except OSError:
             return False
     
     @staticmethod
@@ -330,20 +390,21 @@ def generate_id(prefix: str = "", length: int = 8) -> str:
     random_part = ''.join(random.choices(string.ascii_lowercase + string.digits, k=length))
     return f"{prefix}{random_part}"
 
-def get_data_models_description() -> str:
-    """Get a detailed description of all data models for GPT input.
+@lru_cache(maxsize=1)
+def get_data_model_registry() -> Optional[Mapping[str, type]]:
+    """Get the data model classes defined in data_models.py, keyed by class name.
     
-    This function dynamically discovers and returns a string description of all data models 
-    defined in data_models.py, including their fields, types, and descriptions. This is useful 
-    for providing context to GPT when processing property-related information.
+    The data_models module is imported and scanned once; later calls return the
+    same read-only registry instead of rediscovering the models.
     
     Returns:
-        A string description of all data models
+        Read-only mapping of class name to model class in name order, or None if
+        the data_models module cannot be imported
     """
-    import dataclasses
+    import inspect
+    import msgspec
     import sys
     import os
-    import inspect
     
     # Ensure parent directory is in path
     parent_dir = str(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
@@ -358,15 +419,37 @@ def get_data_models_description() -> str:
         try:
             from .. import data_models as data_models_module
         except ImportError:
-            return "Error: Unable to import data_models module"
+            logger.error("Unable to import data_models module")
+            return None
+    
+    # Keep concrete models defined in the module itself (not imported, not the Model base)
+    return MappingProxyType({
+        name: obj for name, obj in inspect.getmembers(data_models_module)
+        if inspect.isclass(obj)
+        and issubclass(obj, msgspec.Struct)
+        and obj.__module__ == data_models_module.__name__
+        and obj is not getattr(data_models_module, "Model", None)
+    })
+
+@lru_cache(maxsize=None)
+def get_data_models_description() -> str:
+    """Get a detailed description of all data models for GPT input.
+    
+    This function dynamically discovers and returns a string description of all data models 
+    defined in data_models.py, including their fields, types, and descriptions. This is useful 
+    for providing context to GPT when processing property-related information. The models
+    don't change at runtime, so the description is built once and reused.
+    
+    Returns:
+        A string description of all data models
+    """
+    import msgspec
     
-    # Discover all dataclass models in the module
-    data_models = []
-    for name, obj in inspect.getmembers(data_models_module):
-        # Check if it's a dataclass and not imported from another module
-        if dataclasses.is_dataclass(obj) and obj.__module__ == data_models_module.__name__:
-            data_models.append(obj)
+    registry = get_data_model_registry()
+    if registry is None:
+        return "Error: Unable to import data_models module"
     
+    data_models = list(registry.values())
     if not data_models:
         return "No data models found in the data_models module."
     
@@ -380,8 +463,8 @@ def get_data_models_description() -> str:
         
         description += f"## {class_name}\n{class_doc}\n\n### Fields:\n"
         
-        # Get fields from dataclass
-        for field in dataclasses.fields(model):
+        # Get fields from the model
+        for field in msgspec.structs.fields(model):
             field_name = field.name
             field_type = field.type
             
@@ -403,35 +486,33 @@ def get_data_models_description() -> str:
     return description 
 
 def generate_json_schema_from_dataclasses() -> Dict[str, Any]:
-    """Generate a JSON schema from the dataclasses in data_models.py.
+    """Generate a JSON schema from the models in data_models.py.
     
     This function generates a proper JSON schema that can be used with OpenAI's
     structured output feature to ensure the response follows the correct format.
+    The schema is built once; each call returns a fresh copy of it.
     
     Returns:
         A JSON schema dict that represents the property management data structure
     """
-    import dataclasses
-    import sys
-    import os
-    import inspect
-    from typing import get_type_hints, get_origin, get_args, Dict, List, Optional, Any, Union
+    return orjson.loads(_build_json_schema())
+
+@lru_cache(maxsize=None)
+def _build_json_schema() -> bytes:
+    """Build the JSON schema for the data models, serialized with orjson.
     
-    # Ensure parent directory is in path
-    parent_dir = str(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
-    if parent_dir not in sys.path:
-        sys.path.append(parent_dir)
+    The models don't change at runtime, so the type hint and field reflection
+    runs only on the first call.
     
-    # Dynamically import data_models module
-    try:
-        import src.data_models as data_models_module
-    except ImportError:
-        # Try relative import if the above fails
-        try:
-            from .. import data_models as data_models_module
-        except ImportError:
-            logger.error("Unable to import data_models module")
-            return {}
+    Returns:
+        The serialized JSON schema
+    """
+    import msgspec
+    from typing import get_type_hints, get_origin, get_args, Dict, List, Optional, Any, Union
+    
+    registry = get_data_model_registry()
+    if registry is None:
+        return orjson.dumps({})
     
     # Helper function to convert a Python type to a JSON schema type
     def type_to_schema(typ):
@@ -477,8 +558,8 @@ def generate_json_schema_from_dataclasses() -> Dict[str, Any]:
         if typ is bool or typ is Optional[bool]:
             return {"type": "boolean"}
             
-        # Handle references to other dataclasses
-        if dataclasses.is_dataclass(typ):
+        # Handle references to other models
+        if isinstance(typ, type) and registry.get(typ.__name__) is typ:
             return {"$ref": f"#/definitions/{typ.__name__}"}
             
         # Default to any type if we can't determine
@@ -491,38 +572,37 @@ def generate_json_schema_from_dataclasses() -> Dict[str, Any]:
         "definitions": {}
     }
     
-    # Discover and process all dataclass models in the module
-    for name, cls in inspect.getmembers(data_models_module):
-        if dataclasses.is_dataclass(cls) and cls.__module__ == data_models_module.__name__:
-            # Create schema definition for this class
-            class_schema = {
-                "type": "object",
-                "properties": {},
-                "required": []
-            }
-            
-            # Process each field
-            hints = get_type_hints(cls)
-            for field in dataclasses.fields(cls):
-                field_type = hints.get(field.name, Any)
-                field_schema = type_to_schema(field_type)
-                class_schema["properties"][field.name] = field_schema
-                
-                # If the field has no default value, it's required
-                if field.default is dataclasses.MISSING and field.default_factory is dataclasses.MISSING:
-                    class_schema["required"].append(field.name)
-            
-            # Add to definitions
-            schema["definitions"][cls.__name__] = class_schema
+    # Process all models in the registry
+    for name, cls in registry.items():
+        # Create schema definition for this class
+        class_schema = {
+            "type": "object",
+            "properties": {},
+            "required": []
+        }
+        
+        # Process each field
+        hints = get_type_hints(cls)
+        for field in msgspec.structs.fields(cls):
+            field_type = hints.get(field.name, Any)
+            field_schema = type_to_schema(field_type)
+            class_schema["properties"][field.name] = field_schema
             
-            # Add to top-level properties (assuming Property is the main object)
-            if name == "Property":
-                schema["properties"]["property"] = {"$ref": f"#/definitions/{name}"}
-            else:
-                # For other types, assume they're arrays of objects
-                schema["properties"][name.lower() + "s"] = {
-                    "type": "array",
-                    "items": {"$ref": f"#/definitions/{name}"}
-                }
+            # If the field has no default value, it's required
+            if field.required:
+                class_schema["required"].append(field.name)
+        
+        # Add to definitions
+        schema["definitions"][cls.__name__] = class_schema
+        
+        # Add to top-level properties (assuming Property is the main object)
+        if name == "Property":
+            schema["properties"]["property"] = {"$ref": f"#/definitions/{name}"}
+        else:
+            # For other types, assume they're arrays of objects
+            schema["properties"][name.lower() + "s"] = {
+                "type": "array",
+                "items": {"$ref": f"#/definitions/{name}"}
+            }
     
-    return schema 
\ No newline at end of file
+    return orjson.dumps(schema)